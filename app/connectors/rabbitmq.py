@@ -1,11 +1,15 @@
 """RabbitMQ connection manager."""
 
+import asyncio
+
 import aio_pika
 import aio_pika.abc
 
 from app import settings
 
 _connection: aio_pika.abc.AbstractRobustConnection = None
+_queues: dict[str, aio_pika.abc.AbstractQueue] = {}
+_queues_lock = asyncio.Lock()
 
 
 async def get_rabbitmq_connection() -> aio_pika.abc.AbstractRobustConnection:
@@ -18,21 +22,39 @@ async def get_rabbitmq_connection() -> aio_pika.abc.AbstractRobustConnection:
     return _connection
 
 
+async def _get_queue(name: str, cache_key: str, prefetch_count: int | None = None) -> aio_pika.abc.AbstractQueue:
+    """Get a durable queue declared on its own cached channel."""
+
+    async with _queues_lock:
+        queue = _queues.get(cache_key)
+
+        if queue is None or queue.channel.is_closed:
+            connection = await get_rabbitmq_connection()
+            channel: aio_pika.abc.AbstractChannel = await connection.channel()
+
+            if prefetch_count is not None:
+                await channel.set_qos(prefetch_count=prefetch_count)
+
+            queue = await channel.declare_queue(name, durable=True)
+            _queues[cache_key] = queue
+
+    return queue
+
+
 async def get_game_events_queue() -> aio_pika.abc.AbstractQueue:
     """Get the game events queue from which we receive all game events."""
 
-    connection = await get_rabbitmq_connection()
-    channel: aio_pika.abc.AbstractChannel = await connection.channel()
-    queue: aio_pika.abc.AbstractQueue = await channel.declare_queue("game_events", durable=True)
+    return await _get_queue("game_events", "game_events", prefetch_count=settings.game_events_prefetch_count)
 
-    return queue
 
+async def get_game_state_updates_queue(publisher: bool = False) -> aio_pika.abc.AbstractQueue:
+    """Get the game state updates queue to which we publish all game state updates.
 
-async def get_game_state_updates_queue() -> aio_pika.abc.AbstractQueue:
-    """Get the game state updates queue to which we publish all game state updates."""
+    Publishers get the queue bound to a separate channel, so that publishing is not affected by the
+    consumer-side channel settings.
+    """
 
-    connection = await get_rabbitmq_connection()
-    channel: aio_pika.abc.AbstractChannel = await connection.channel()
-    queue: aio_pika.abc.AbstractQueue = await channel.declare_queue("game_state_updates", durable=True)
+    if publisher:
+        return await _get_queue("game_state_updates", "game_state_updates:publisher")
 
-    return queue
+    return await _get_queue("game_state_updates", "game_state_updates")
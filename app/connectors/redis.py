@@ -1,10 +1,13 @@
 """Redis connection manager."""
 
+import weakref
+
 import redis.asyncio as aioredis
 
 from app import settings
 
 _redis: aioredis.Redis = None
+_script_shas: weakref.WeakKeyDictionary[aioredis.Redis, dict[str, str]] = weakref.WeakKeyDictionary()
 
 
 async def get_redis_connection() -> aioredis.Redis:
@@ -12,6 +15,28 @@ async def get_redis_connection() -> aioredis.Redis:
     global _redis
 
     if _redis is None:
-        _redis = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+        # Callers wait for a free connection instead of failing with "Too many connections" when the pool is exhausted
+        pool = aioredis.BlockingConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            timeout=settings.redis_pool_timeout,
+            decode_responses=True,
+        )
+        _redis = aioredis.Redis.from_pool(pool)
 
     return _redis
+
+
+async def get_redis_script_sha(redis: aioredis.Redis, script: str, reload: bool = False) -> str:
+    """Get the SHA1 of a Lua script loaded into the given Redis, loading it with SCRIPT LOAD on first use.
+
+    Queue the script with `EVALSHA` on the same client using the returned SHA1. Pass `reload=True` after a NOSCRIPT
+    error, for example after Redis was restarted or its script cache flushed.
+    """
+
+    shas = _script_shas.setdefault(redis, {})
+
+    if reload or script not in shas:
+        shas[script] = await redis.script_load(script)
+
+    return shas[script]
@@ -1,40 +1,130 @@
 """Game events consumer module."""
 
-import json
+import asyncio
 import logging
 import uuid
 
 import aio_pika
+import aio_pika.abc
+import aio_pika.exceptions
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 from app import settings
 from app.connectors.rabbitmq import get_game_events_queue, get_game_state_updates_queue
 from app.connectors.redis import get_redis_connection
+from app.game_state.utils import get_game_event_key
 
 logger = logging.getLogger(__name__)
 
+_TRANSIENT_ERRORS = (
+    aio_pika.exceptions.AMQPError,
+    RedisConnectionError,
+    RedisTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
 
 async def start_consumer():
     """Start the consumer for game events."""
 
-    events_queue = await get_game_events_queue()
-    state_updates_queue = await get_game_state_updates_queue()
+    state_updates_queue = await get_game_state_updates_queue(publisher=True)
     redis = await get_redis_connection()
 
-    async with events_queue.iterator() as queue_iter:
-        async for message in queue_iter:
-            async with message.process():
-                logging.info(f"Received message: {message.body.decode()}")
-
-                try:
-                    data = json.loads(message.body.decode())
-                except json.JSONDecodeError as e:
-                    logger.warning("Error decoding JSON: %s", e)
-                else:
-                    event_id = str(uuid.uuid4())
-                    data["payload"] = json.dumps(data["payload"])
-                    name = f"{settings.redis_game_events_namespace}:event:{event_id}"
-                    await redis.hset(name=name, mapping=data)
-                    await state_updates_queue.channel.default_exchange.publish(
-                        aio_pika.Message(body=event_id.encode()),
-                        routing_key=state_updates_queue.name,
-                    )
+    while True:
+        events_queue = await get_game_events_queue()
+        incoming: asyncio.Queue[aio_pika.abc.AbstractIncomingMessage] = asyncio.Queue()
+        await events_queue.consume(incoming.put)
+
+        await consume_batches(incoming, redis, state_updates_queue)
+
+        # Close the channel instead of nacking the failed batch, so that the broker requeues it together with every
+        # event prefetched after it and redelivers them in their original order on a new channel
+        try:
+            await events_queue.channel.close()
+        except _TRANSIENT_ERRORS:
+            logger.exception("Error closing the game events channel")
+
+
+async def consume_batches(
+    incoming: asyncio.Queue[aio_pika.abc.AbstractIncomingMessage],
+    redis: aioredis.Redis,
+    state_updates_queue: aio_pika.abc.AbstractQueue,
+) -> None:
+    """Process batches of game events until one fails with a transient Redis or RabbitMQ error."""
+
+    while True:
+        messages = await collect_batch(incoming)
+
+        try:
+            await process_batch(messages, redis, state_updates_queue)
+        except _TRANSIENT_ERRORS:
+            logger.exception("Transient error processing batch of %d game events, requeueing", len(messages))
+            return
+        except Exception:
+            # Retrying would fail the same way, reject the batch like message.process() rejects a failed message
+            logger.exception("Error processing batch of %d game events, rejecting", len(messages))
+            await messages[-1].nack(multiple=True, requeue=False)
+        else:
+            await messages[-1].ack(multiple=True)
+
+
+async def collect_batch(
+    incoming: asyncio.Queue[aio_pika.abc.AbstractIncomingMessage],
+) -> list[aio_pika.abc.AbstractIncomingMessage]:
+    """Wait for the next message and collect the ones following it within the batch time window."""
+
+    messages = [await incoming.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.game_events_batch_timeout
+
+    while len(messages) < settings.game_events_batch_size:
+        timeout = deadline - loop.time()
+
+        if timeout <= 0:
+            break
+
+        try:
+            messages.append(await asyncio.wait_for(incoming.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+
+    return messages
+
+
+async def process_batch(
+    messages: list[aio_pika.abc.AbstractIncomingMessage],
+    redis: aioredis.Redis,
+    state_updates_queue: aio_pika.abc.AbstractQueue,
+) -> None:
+    """Store a batch of game events in Redis and publish their IDs for processing."""
+
+    event_ids = []
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for message in messages:
+            logger.info("Received message: %r", message.body)
+
+            try:
+                orjson.loads(message.body)
+            except orjson.JSONDecodeError as e:
+                logger.warning("Error decoding JSON: %s", e)
+            else:
+                # Store the raw message body, it is decoded only once more by the game state consumer
+                event_id = str(uuid.uuid4())
+                pipe.set(get_game_event_key(event_id), message.body)
+                event_ids.append(event_id)
+
+        await pipe.execute()
+
+    # Publish the whole batch at once so broker confirms are awaited together instead of one by one
+    exchange = state_updates_queue.channel.default_exchange
+    await asyncio.gather(
+        *(
+            exchange.publish(aio_pika.Message(body=event_id.encode()), routing_key=state_updates_queue.name)
+            for event_id in event_ids
+        )
+    )
@@ -1,6 +1,8 @@
 """Data models for game events."""
 
 import logging
+from datetime import datetime
+from functools import cached_property
 from typing import Any, Union
 
 from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
@@ -26,6 +28,15 @@ class GameEvent(BaseModel):
     payload: Any
     timestamp: str | None = Field(None, description="Timestamp of the event")
 
+    @cached_property
+    def timestamp_epoch(self) -> float | None:
+        """Event timestamp as a Unix timestamp, parsed once per event."""
+
+        if self.timestamp is None:
+            return None
+
+        return datetime.fromisoformat(self.timestamp).timestamp()
+
     @field_validator("type_", mode="before")
     def validate_type(cls, value: str) -> EVENT_TYPE:
         """Validate the event type."""
@@ -37,28 +48,19 @@ class GameEvent(BaseModel):
 
     @model_validator(mode="after")
     def resolve_payload(self) -> PayloadType | None:
-        try:
-            payload_data = self.payload
-            match self.type_:
-                case EVENT_TYPE.MATCH_START:
-                    payload = MatchStartPayload(**payload_data)
-                case EVENT_TYPE.MINION_KILL:
-                    payload = MinionKillPayload(**payload_data)
-                case EVENT_TYPE.PLAYER_KILL:
-                    payload = PlayerKillPayload(**payload_data)
-                case EVENT_TYPE.DRAGON_KILL:
-                    payload = DragonKillPayload(**payload_data)
-                case EVENT_TYPE.TURRET_DESTROY:
-                    payload = TurretDestroyPayload(**payload_data)
-                case EVENT_TYPE.MATCH_END:
-                    payload = MatchEndPayload(**payload_data)
-                case EVENT_TYPE.UNKNOWN:
-                    logger.warning("Unknown event type: %s", self.type_)
-                    logger.debug("Payload data: %s", payload_data)
-                    payload = None
-        except ValidationError as e:
-            logging.error("Validation error while parsing event payload: %s", e)
-            raise ValueError("Invalid payload data") from e
+        payload_data = self.payload
+        payload_model = _PAYLOAD_MODELS.get(self.type_)
+
+        if payload_model is None:
+            logger.warning("Unknown event type: %s", self.type_)
+            logger.debug("Payload data: %s", payload_data)
+            payload = None
+        else:
+            try:
+                payload = payload_model.model_validate(payload_data)
+            except ValidationError as e:
+                logging.error("Validation error while parsing event payload: %s", e)
+                raise ValueError("Invalid payload data") from e
 
         self.payload = payload
         return self
@@ -145,3 +147,13 @@ class MatchPlayer(BaseModel):
     gold: int = Field(..., description="Number of gold coins")
     alive: bool = Field(..., description="Is the player alive?")
     name: str = Field(..., description="Name of the player")
+
+
+_PAYLOAD_MODELS: dict[EVENT_TYPE, type[BaseModel]] = {
+    EVENT_TYPE.MATCH_START: MatchStartPayload,
+    EVENT_TYPE.MINION_KILL: MinionKillPayload,
+    EVENT_TYPE.PLAYER_KILL: PlayerKillPayload,
+    EVENT_TYPE.DRAGON_KILL: DragonKillPayload,
+    EVENT_TYPE.TURRET_DESTROY: TurretDestroyPayload,
+    EVENT_TYPE.MATCH_END: MatchEndPayload,
+}
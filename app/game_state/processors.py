@@ -1,10 +1,11 @@
 """Module for processing stored game events."""
 
-import json
-from datetime import datetime
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import NoScriptError
 
 from app import settings
-from app.connectors.redis import get_redis_connection
+from app.connectors.redis import get_redis_script_sha
 from app.game_event.models import (
     DragonKillPayload,
     GameEvent,
@@ -22,14 +23,35 @@ from app.game_state.utils import (
     get_game_state_key,
     get_player_death_history_key,
     get_player_kill_history_key,
+    get_player_kill_streaks_key,
     get_player_state_key,
     get_team_state_key,
 )
 
+# Atomically set the match's first blood timestamp if it is unset or later than the given one
+FIRST_BLOOD_LUA = """
+local current = redis.call('HGET', KEYS[1], 'first_blood')
+if not current then
+    return -1
+end
+if current == '-1' or tonumber(ARGV[1]) < tonumber(current) then
+    redis.call('HSET', KEYS[1], 'first_blood', ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# Lowest first blood timestamp already submitted per match. The stored first blood can only be lower or equal,
+# so later kills with a timestamp at or after it can skip the script.
+_first_blood_timestamps: dict[str, float] = {}
+
 
 class GameEventProcessor:
     """Class for processing game events."""
 
+    def __init__(self, redis: aioredis.Redis) -> None:
+        self.redis = redis
+
     async def process_event(self, event: GameEvent) -> None:
         """Process a game event."""
 
@@ -51,7 +73,7 @@ class MatchStartProcessor(GameEventProcessor):
             "series_current": payload.fixture.series_current,
             "series_max": payload.fixture.series_max,
             "series_type": payload.fixture.series_type,
-            "teams": json.dumps(
+            "teams": orjson.dumps(
                 [
                     {
                         "team_id": team.team_id,
@@ -62,39 +84,45 @@ class MatchStartProcessor(GameEventProcessor):
             ),
             "first_blood": -1,
         }
-        redis = await get_redis_connection()
-
-        # Store the match metadata in Redis
-        redis_key = get_game_state_key(match_id)
-        await redis.hset(redis_key, mapping=match_metadata)
-
-        # Store each team's state in Redis
-        for team in payload.teams:
-            team_key = get_team_state_key(team.team_id, match_id)
-            team_metadata = {
-                "dragon_kills": 0,
-                "tower_kills": 0,
-            }
-            await redis.hset(team_key, mapping=team_metadata)
-
-        # Store each player's state in Redis
-        for team in payload.teams:
-            for player in team.players:
-                # Register the player in the PlayerRegistry
-                PlayerRegistry.register_player(player.player_id, match_id, team.team_id)
-
-                player_key = get_player_state_key(player.player_id)
-                player_metadata = {
-                    "player_id": player.player_id,
-                    "gold": player.gold,
-                    "alive": int(player.alive),
-                    "name": player.name,
-                    "minion_kills": 0,
-                    "human_kills": 0,
-                    "human_kills_assists": 0,
-                    "team_members": json.dumps([p.player_id for p in team.players if p.player_id != player.player_id]),
+        redis = self.redis
+
+        # Forget any first blood cached for a previous run of the same match id
+        _first_blood_timestamps.pop(match_id, None)
+
+        async with redis.pipeline(transaction=False) as pipe:
+            # Store the match metadata in Redis
+            redis_key = get_game_state_key(match_id)
+            pipe.hset(redis_key, mapping=match_metadata)
+
+            # Store each team's and its players' state in Redis
+            for team in payload.teams:
+                team_key = get_team_state_key(team.team_id, match_id)
+                team_metadata = {
+                    "dragon_kills": 0,
+                    "tower_kills": 0,
                 }
-                await redis.hset(player_key, mapping=player_metadata)
+                pipe.hset(team_key, mapping=team_metadata)
+
+                for player in team.players:
+                    # Register the player in the PlayerRegistry
+                    PlayerRegistry.register_player(player.player_id, match_id, team.team_id)
+
+                    player_key = get_player_state_key(player.player_id, match_id)
+                    player_metadata = {
+                        "player_id": player.player_id,
+                        "gold": player.gold,
+                        "alive": int(player.alive),
+                        "name": player.name,
+                        "minion_kills": 0,
+                        "human_kills": 0,
+                        "human_kills_assists": 0,
+                        "team_members": orjson.dumps(
+                            [p.player_id for p in team.players if p.player_id != player.player_id]
+                        ),
+                    }
+                    pipe.hset(player_key, mapping=player_metadata)
+
+            await pipe.execute()
 
 
 class MinionKillProcessor(GameEventProcessor):
@@ -109,15 +137,20 @@ class MinionKillProcessor(GameEventProcessor):
         if payload.gold_granted is None:
             return
 
-        redis = await get_redis_connection()
+        redis = self.redis
         player_key = get_player_state_key(payload.player_id)
-        # Increment the player's gold and minion kills
-        await redis.hincrby(player_key, "gold", payload.gold_granted)
-        await redis.hincrby(player_key, "minion_kills", 1)
-        # Add event timestamp to the player's kill history
-        player_kill_history_key = get_player_kill_history_key(payload.player_id)
-        timestamp = datetime.fromisoformat(event.timestamp).timestamp()
-        await add_kill_history(player_kill_history_key, timestamp, kill_type="minion")
+
+        async with redis.pipeline(transaction=False) as pipe:
+            # Increment the player's gold and minion kills
+            pipe.hincrby(player_key, "gold", payload.gold_granted)
+            pipe.hincrby(player_key, "minion_kills", 1)
+            # Add event timestamp to the player's kill history
+            player_kill_history_key = get_player_kill_history_key(payload.player_id)
+
+            if event.timestamp_epoch is not None:
+                add_kill_history(pipe, player_kill_history_key, event.timestamp_epoch, kill_type="minion")
+
+            await pipe.execute()
 
 
 class PlayerKillProcessor(GameEventProcessor):
@@ -127,52 +160,62 @@ class PlayerKillProcessor(GameEventProcessor):
         """Process a player kill event."""
 
         payload: PlayerKillPayload = event.payload
-        redis = await get_redis_connection()
+        redis = self.redis
 
         killer_id = payload.killer_id
 
-        if killer_id is not None:
-            # Increment the killer's gold, human kills, and add event timestamp to the kill history
-            killer_state_key = get_player_state_key(killer_id)
+        async with redis.pipeline(transaction=False) as pipe:
+            if killer_id is not None:
+                # Increment the killer's gold, human kills, and add event timestamp to the kill history
+                killer_state_key = get_player_state_key(killer_id)
 
-            if payload.gold_granted is not None:
-                await redis.hincrby(killer_state_key, "gold", payload.gold_granted)
+                if payload.gold_granted is not None:
+                    pipe.hincrby(killer_state_key, "gold", payload.gold_granted)
 
-            await redis.hincrby(killer_state_key, "human_kills", 1)
+                pipe.hincrby(killer_state_key, "human_kills", 1)
 
-            # Add event timestamp to the killer's kill history
-            killer_kill_history_key = get_player_kill_history_key(killer_id)
-            if event.timestamp is not None:
-                timestamp = datetime.fromisoformat(event.timestamp).timestamp()
-                await add_kill_history(killer_kill_history_key, timestamp, kill_type="human")
-
-        # Update assistants' gold and human kills
-        if payload.assistants is not None:
-            for assistant_id in payload.assistants:
-                assistant_state_key = get_player_state_key(assistant_id)
-                await redis.hincrby(assistant_state_key, "gold", payload.assist_gold)
-                await redis.hincrby(assistant_state_key, "human_kills_assists", 1)
-
-        # Update the victim's death history
-        if payload.victim_id is not None and event.timestamp is not None:
-            victim_death_history_key = get_player_death_history_key(payload.victim_id)
-            timestamp = datetime.fromisoformat(event.timestamp).timestamp()
-            await redis.zadd(victim_death_history_key, {timestamp: timestamp})
-
-        # Update the match's first blood timestamp
-        if event.timestamp is not None:
-            if payload.killer_id is None and payload.victim_id is None:
-                return
-
-            timestamp = datetime.fromisoformat(event.timestamp).timestamp()
-            match_id = PlayerRegistry.get_match_id_for_player(killer_id or payload.victim_id)
-            match_state_key = get_game_state_key(match_id)
-            first_blood = await redis.hget(match_state_key, "first_blood")
-
-            if first_blood == "-1":
-                await redis.hset(match_state_key, "first_blood", timestamp)
-            elif timestamp < float(first_blood):
-                await redis.hset(match_state_key, "first_blood", timestamp)
+                # Add event timestamp to the killer's kill history
+                killer_kill_history_key = get_player_kill_history_key(killer_id)
+                if event.timestamp_epoch is not None:
+                    add_kill_history(pipe, killer_kill_history_key, event.timestamp_epoch, kill_type="human")
+
+            # Update assistants' gold and human kills
+            if payload.assistants is not None:
+                for assistant_id in payload.assistants:
+                    assistant_state_key = get_player_state_key(assistant_id)
+                    pipe.hincrby(assistant_state_key, "gold", payload.assist_gold)
+                    pipe.hincrby(assistant_state_key, "human_kills_assists", 1)
+
+            # Update the victim's death history
+            if payload.victim_id is not None and event.timestamp_epoch is not None:
+                victim_death_history_key = get_player_death_history_key(payload.victim_id)
+                pipe.zadd(victim_death_history_key, {event.timestamp_epoch: event.timestamp_epoch})
+
+            # Update the match's first blood timestamp
+            update_first_blood = False
+
+            if event.timestamp_epoch is not None and (killer_id is not None or payload.victim_id is not None):
+                match_id = PlayerRegistry.get_match_id_for_player(killer_id or payload.victim_id)
+                update_first_blood = event.timestamp_epoch < _first_blood_timestamps.get(match_id, float("inf"))
+
+            if update_first_blood:
+                match_state_key = get_game_state_key(match_id)
+                first_blood_sha = await get_redis_script_sha(redis, FIRST_BLOOD_LUA)
+                pipe.evalsha(first_blood_sha, 1, match_state_key, event.timestamp_epoch)
+
+            results = await pipe.execute(raise_on_error=False)
+
+        if update_first_blood and isinstance(results[-1], NoScriptError):
+            # Redis lost its script cache, reload the script and retry only the script so no update is applied twice
+            first_blood_sha = await get_redis_script_sha(redis, FIRST_BLOOD_LUA, reload=True)
+            results[-1] = await redis.evalsha(first_blood_sha, 1, match_state_key, event.timestamp_epoch)
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+        if update_first_blood and results[-1] != -1:
+            _first_blood_timestamps[match_id] = event.timestamp_epoch
 
 
 class DragonKillProcessor(GameEventProcessor):
@@ -182,28 +225,29 @@ class DragonKillProcessor(GameEventProcessor):
         """Process a dragon kill event."""
 
         payload: DragonKillPayload = event.payload
-        redis = await get_redis_connection()
+        redis = self.redis
 
         if payload.gold_granted is None or payload.killer_id is None:
             return
 
         killer_id = payload.killer_id
 
-        # Increment the killer's gold
-        killer_state_key = get_player_state_key(killer_id)
-        await redis.hincrby(killer_state_key, "gold", payload.gold_granted)
+        async with redis.pipeline(transaction=False) as pipe:
+            # Increment the killer's gold
+            killer_state_key = get_player_state_key(killer_id)
+            pipe.hincrby(killer_state_key, "gold", payload.gold_granted)
 
-        # Add event timestamp to the killer's kill history
-        killer_kill_history_key = get_player_kill_history_key(killer_id)
+            # Add event timestamp to the killer's kill history
+            killer_kill_history_key = get_player_kill_history_key(killer_id)
 
-        if event.timestamp is not None:
-            timestamp = datetime.fromisoformat(event.timestamp).timestamp()
-            await add_kill_history(killer_kill_history_key, timestamp, kill_type="dragon")
+            if event.timestamp_epoch is not None:
+                add_kill_history(pipe, killer_kill_history_key, event.timestamp_epoch, kill_type="dragon")
 
-        # Increment the team's dragon kills
-        team_id = PlayerRegistry.get_team_id(killer_id)
-        team_state_key = get_team_state_key(team_id)
-        await redis.hincrby(team_state_key, "dragon_kills", 1)
+            # Increment the team's dragon kills
+            team_id = PlayerRegistry.get_team_id(killer_id)
+            team_state_key = get_team_state_key(team_id)
+            pipe.hincrby(team_state_key, "dragon_kills", 1)
+            await pipe.execute()
 
 
 class TurretDestroyProcessor(GameEventProcessor):
@@ -213,30 +257,29 @@ class TurretDestroyProcessor(GameEventProcessor):
         """Process a turret destroy event."""
 
         payload: TurretDestroyPayload = event.payload
-        redis = await get_redis_connection()
+        redis = self.redis
 
         # Increment the team's tower kills
         if payload.killer_id is not None:
-            team_state_key = get_team_state_key(payload.killer_team_id)
-            await redis.hincrby(team_state_key, "tower_kills", 1)
+            async with redis.pipeline(transaction=False) as pipe:
+                team_state_key = get_team_state_key(payload.killer_team_id)
+                pipe.hincrby(team_state_key, "tower_kills", 1)
 
-            # Increment the killer's and teammates' gold
-            killer_id = payload.killer_id
-            player_ids = PlayerRegistry.players_for_team(payload.killer_team_id)
+                # Increment the killer's and teammates' gold
+                killer_id = payload.killer_id
+                player_ids = PlayerRegistry.players_for_team(payload.killer_team_id)
 
-            for player_id in player_ids:
-                if player_id == killer_id:
-                    gold_granted = payload.player_gold_granted
+                for player_id in player_ids:
+                    if player_id == killer_id:
+                        gold_granted = payload.player_gold_granted
+                    else:
+                        gold_granted = payload.team_gold_granted
 
                     if gold_granted is not None:
                         player_state_key = get_player_state_key(player_id)
-                        await redis.hincrby(player_state_key, "gold", gold_granted)
-                else:
-                    gold_granted = payload.team_gold_granted
+                        pipe.hincrby(player_state_key, "gold", gold_granted)
 
-                    if gold_granted is not None:
-                        player_state_key = get_player_state_key(player_id)
-                        await redis.hincrby(player_state_key, "gold", gold_granted)
+                await pipe.execute()
 
 
 class MatchEndProcessor(GameEventProcessor):
@@ -246,47 +289,48 @@ class MatchEndProcessor(GameEventProcessor):
         """Process a match end event."""
 
         payload: MatchEndPayload = event.payload
-        redis = await get_redis_connection()
+        redis = self.redis
 
         # Update the match state with the winning team ID
         match_id = event.match_id
         match_state_key = get_game_state_key(match_id)
         await redis.hset(match_state_key, "winning_team_id", payload.winning_team_id)
+        _first_blood_timestamps.pop(match_id, None)
 
-        # Update player states with killing streaks
-        await self.calculate_kill_streaks(match_id)
-        # Update player states with max killing sprees
-        await self.calculate_max_killing_sprees(match_id)
+        # Update player states with kill streaks and max killing sprees
+        await self.finalize_player_stats(match_id)
 
-    async def calculate_kill_streaks(self, match_id: str) -> None:
-        """Calculate kill streaks for players in the match."""
+    async def finalize_player_stats(self, match_id: str) -> None:
+        """Calculate kill streaks and max killing sprees for players in the match."""
 
-        redis = await get_redis_connection()
+        redis = self.redis
         all_players = PlayerRegistry.players_for_match(match_id)
 
-        for player_id in all_players:
-            player_kill_history_key = get_player_kill_history_key(player_id)
-            kill_history = [json.loads(h) for h in await redis.zrange(player_kill_history_key, 0, -1)]
-            kill_timestamps = [h["timestamp"] for h in kill_history]
-            kill_streaks = calculate_kill_streaks(kill_timestamps, settings.kill_streak_time_window)
-
-            # Store the kill streaks in Redis
-            player_state_key = get_player_state_key(player_id)
-            await redis.hset(player_state_key, "kill_streaks", json.dumps(kill_streaks))
-
-    async def calculate_max_killing_sprees(self, match_id: str) -> None:
-        """Calculate max killing sprees for players in the match."""
-
-        redis = await get_redis_connection()
-        all_players = PlayerRegistry.players_for_match(match_id)
-
-        for player_id in all_players:
-            player_kill_history_key = get_player_kill_history_key(player_id)
-            player_death_history_key = get_player_death_history_key(player_id)
-            kill_history = [json.loads(h) for h in await redis.zrange(player_kill_history_key, 0, -1)]
-            death_history = [float(ts) for ts in await redis.zrange(player_death_history_key, 0, -1)]
-            max_killing_spree = calculate_max_killing_spree(kill_history, death_history)
-
-            # Store the max killing spree in Redis
-            player_state_key = get_player_state_key(player_id)
-            await redis.hset(player_state_key, "max_killing_spree", max_killing_spree)
+        # Fetch all players' kill and death histories in a single round-trip
+        async with redis.pipeline(transaction=False) as pipe:
+            for player_id in all_players:
+                player_kill_history_key = get_player_kill_history_key(player_id)
+                player_death_history_key = get_player_death_history_key(player_id)
+                pipe.zrange(player_kill_history_key, 0, -1, withscores=True)
+                pipe.zrange(player_death_history_key, 0, -1, withscores=True)
+
+            histories = await pipe.execute()
+
+        # Store the kill streaks and max killing sprees in Redis
+        async with redis.pipeline(transaction=False) as pipe:
+            for player_id, kill_history, death_history in zip(all_players, histories[::2], histories[1::2]):
+                kill_timestamps = [timestamp for _, timestamp in kill_history]
+                death_timestamps = [timestamp for _, timestamp in death_history]
+                kill_streaks = calculate_kill_streaks(kill_timestamps, settings.kill_streak_time_window)
+                max_killing_spree = calculate_max_killing_spree(kill_history, death_timestamps)
+                player_state_key = get_player_state_key(player_id)
+                player_kill_streaks_key = get_player_kill_streaks_key(player_id)
+                pipe.delete(player_kill_streaks_key)
+
+                if kill_streaks:
+                    pipe.rpush(player_kill_streaks_key, *kill_streaks)
+
+                # Written last, readers treat the presence of max_killing_spree as the player's state being complete
+                pipe.hset(player_state_key, "max_killing_spree", max_killing_spree)
+
+            await pipe.execute()
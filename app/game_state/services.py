@@ -1,11 +1,11 @@
 """Game state related services."""
 
-import json
 import logging
 
+import orjson
+import redis.asyncio as aioredis
 from pydantic import ValidationError
 
-from app import settings
 from app.connectors.redis import get_redis_connection
 from app.game_event.enum import EVENT_TYPE
 from app.game_event.models import GameEvent
@@ -20,7 +20,9 @@ from app.game_state.processors import (
 )
 from app.game_state.utils import (
     from_unix_timestamp,
+    get_game_event_key,
     get_game_state_key,
+    get_player_kill_streaks_key,
     get_player_state_key,
     get_team_state_key,
     max_killing_spree_label,
@@ -28,6 +30,18 @@ from app.game_state.utils import (
 
 logger = logging.getLogger(__name__)
 
+TEAM_STATE_FIELDS = ("dragon_kills", "tower_kills")
+PLAYER_STATE_FIELDS = (
+    "player_id",
+    "name",
+    "alive",
+    "gold",
+    "human_kills",
+    "human_kills_assists",
+    "minion_kills",
+    "max_killing_spree",
+)
+
 
 class GameState:
     """Game state service class.
@@ -55,6 +69,8 @@ class GameState:
         - human_kills: Number of human kills
         - human_kills_assists: Number of human kills assists
         - team_members: List of team members in the match
+        - max_killing_spree: Maximum number of kills before a death, set at the end of the match
+      - game:<match_id>:player:<player_id>:kill_streaks - Player kill streaks. List set at the end of the match.
       - game:<match_id>:player:<player_id>:kill_history - Player kill history. Sorted set of player kill timestamps.
       - game:<match_id>:player:<player_id>:death_history - Player death history. Sorted set of player death timestamps.
     """
@@ -83,7 +99,7 @@ class GameState:
 
     def to_dict(self) -> dict:
         """Convert the game state to a dictionary."""
-        return models.GameState(
+        return models.GameState.model_construct(
             match_id=self.match_id,
             title=self.title,
             start_time=self.start_time,
@@ -102,35 +118,54 @@ class GameState:
         redis = await get_redis_connection()
         game_state_key = get_game_state_key(match_id)
         game_state_data = await redis.hgetall(game_state_key)
-        teams_data = json.loads(game_state_data["teams"])
+        teams_data = orjson.loads(game_state_data["teams"])
         team_states = {}
 
+        # Fetch all team and player states in a single round-trip, each team followed by its players
+        async with redis.pipeline(transaction=False) as pipe:
+            for team_data in teams_data:
+                pipe.hmget(get_team_state_key(team_data["team_id"], match_id), TEAM_STATE_FIELDS)
+
+                for player_id in team_data["players"]:
+                    pipe.hmget(get_player_state_key(player_id, match_id), PLAYER_STATE_FIELDS)
+                    pipe.lrange(get_player_kill_streaks_key(player_id, match_id), 0, -1)
+
+            results = iter(await pipe.execute())
+
         for team_data in teams_data:
             player_states = {}
             team_id = team_data["team_id"]
-            team_state_key = get_team_state_key(team_id, match_id)
-            team_state_data = await redis.hgetall(team_state_key)
+            dragon_kills, tower_kills = next(results)
 
             for player_id in team_data["players"]:
-                player_state_key = get_player_state_key(player_id, match_id)
-                player_state_data = await redis.hgetall(player_state_key)
-                player_state = models.PlayerState(
-                    player_id=player_state_data["player_id"],
-                    name=player_state_data["name"],
-                    alive=player_state_data["alive"],
-                    gold=player_state_data["gold"],
-                    human_kills=player_state_data["human_kills"],
-                    human_kills_assists=player_state_data["human_kills_assists"],
-                    minion_kills=player_state_data["minion_kills"],
-                    kill_streaks=json.loads(player_state_data["kill_streaks"]),
-                    max_killing_spree=max_killing_spree_label(int(player_state_data["max_killing_spree"])),
+                (
+                    state_player_id,
+                    name,
+                    alive,
+                    gold,
+                    human_kills,
+                    human_kills_assists,
+                    minion_kills,
+                    max_killing_spree,
+                ) = next(results)
+                kill_streaks = next(results)
+                player_state = models.PlayerState.model_construct(
+                    player_id=state_player_id,
+                    name=name,
+                    alive=alive == "1",
+                    gold=int(gold),
+                    human_kills=int(human_kills),
+                    human_kills_assists=int(human_kills_assists),
+                    minion_kills=int(minion_kills),
+                    kill_streaks=kill_streaks,
+                    max_killing_spree=max_killing_spree_label(int(max_killing_spree)),
                 )
                 player_states[player_id] = player_state
 
-            team_state = models.TeamState(
+            team_state = models.TeamState.model_construct(
                 team_id=team_id,
-                dragon_kills=int(team_state_data["dragon_kills"]),
-                tower_kills=int(team_state_data["tower_kills"]),
+                dragon_kills=int(dragon_kills),
+                tower_kills=int(tower_kills),
                 players=player_states,
             )
             team_states[team_id] = team_state
@@ -140,39 +175,33 @@ class GameState:
             title=game_state_data["title"],
             start_time=game_state_data["start_time"],
             series_type=game_state_data["series_type"],
-            series_current=game_state_data["series_current"],
-            series_max=game_state_data["series_max"],
+            series_current=int(game_state_data["series_current"]),
+            series_max=int(game_state_data["series_max"]),
             winning_team_id=game_state_data["winning_team_id"],
             first_blood=from_unix_timestamp(float(game_state_data["first_blood"])),
             teams=team_states,
         )
 
 
-async def process_game_event(event_id: str) -> None:
-    """Process a game event."""
+async def process_game_event(event_id: str, redis: aioredis.Redis | None = None) -> None:
+    """Process a game event.
+
+    Consumers pass the Redis client they acquired at startup, so that no lookup is needed per event.
+    """
+
+    if redis is None:
+        redis = await get_redis_connection()
 
     # Fetch the event data from Redis
-    redis = await get_redis_connection()
-    event_data = await redis.hgetall(f"{settings.redis_game_events_namespace}:event:{event_id}")
+    event_body = await redis.get(get_game_event_key(event_id))
 
-    if not event_data:
+    if event_body is None:
         logger.warning("Event data not found in Redis for event ID: %s", event_id)
         return
 
-    # Deserialize the event payload data
-    if "payload" in event_data:
-        try:
-            event_data["payload"] = json.loads(event_data["payload"])
-        except json.JSONDecodeError as e:
-            logger.warning("Error decoding JSON payload: %s", e)
-            return
-    else:
-        logger.warning("Payload not found in event data for event ID: %s", event_id)
-        return
-
-    # Deserialize the event data
+    # Decode and validate the event data in a single pass
     try:
-        event = GameEvent(**event_data)
+        event = GameEvent.model_validate_json(event_body)
     except ValidationError as e:
         logger.error("Failed to deserialize event data: %s", e.errors())
     else:
@@ -181,16 +210,16 @@ async def process_game_event(event_id: str) -> None:
         # Process the event based on its type
         match event.type_:
             case EVENT_TYPE.MATCH_START:
-                await MatchStartProcessor().process_event(event)
+                await MatchStartProcessor(redis).process_event(event)
             case EVENT_TYPE.MINION_KILL:
-                await MinionKillProcessor().process_event(event)
+                await MinionKillProcessor(redis).process_event(event)
             case EVENT_TYPE.PLAYER_KILL:
-                await PlayerKillProcessor().process_event(event)
+                await PlayerKillProcessor(redis).process_event(event)
             case EVENT_TYPE.DRAGON_KILL:
-                await DragonKillProcessor().process_event(event)
+                await DragonKillProcessor(redis).process_event(event)
             case EVENT_TYPE.TURRET_DESTROY:
-                await TurretDestroyProcessor().process_event(event)
+                await TurretDestroyProcessor(redis).process_event(event)
             case EVENT_TYPE.MATCH_END:
-                await MatchEndProcessor().process_event(event)
+                await MatchEndProcessor(redis).process_event(event)
             case _:
                 logger.warning("No processor found for event type: %s", event.type_)
@@ -1,10 +1,35 @@
 """Utility functions for game state management."""
 
-import json
+import time
+from bisect import bisect_right
+from collections import Counter
 from datetime import UTC, datetime
 
+from redis.asyncio.client import Pipeline
+
 from app import settings
-from app.connectors.redis import get_redis_connection
+
+_GAME_STATE_KEY_PREFIX = f"{settings.redis_game_state_namespace}:game:"
+_GAME_EVENT_KEY_PREFIX = f"{settings.redis_game_events_namespace}:event:"
+
+KILL_STREAK_LABELS = {
+    2: "Double Kill",
+    3: "Triple Kill",
+    4: "Quadra Kill",
+    5: "Penta Kill",
+}
+
+# Indexed by the killing spree length, sprees longer than 7 kills share the last label
+KILLING_SPREE_LABELS = (
+    None,
+    None,
+    None,
+    "Killing Spree",
+    "Rampage",
+    "Unstoppable",
+    "Dominating",
+    "Godlike",
+)
 
 
 def to_unix_timestamp(iso_string: str) -> int:
@@ -14,17 +39,35 @@ def to_unix_timestamp(iso_string: str) -> int:
     return int(dt.timestamp())
 
 
-def from_unix_timestamp(timestamp: int) -> str:
+def from_unix_timestamp(timestamp: float) -> str:
     """Convert a Unix timestamp to an ISO 8601 string."""
 
-    dt = datetime.fromtimestamp(timestamp, UTC)
-    return dt.isoformat()
+    if not float(timestamp).is_integer():
+        # Only fractional timestamps need datetime to render the microseconds
+        return datetime.fromtimestamp(timestamp, UTC).isoformat()
+
+    return f"{format_utc_timestamp(timestamp, 'T')}+00:00"
+
+
+def format_utc_timestamp(timestamp: float, separator: str = " ") -> str:
+    """Format a Unix timestamp as a UTC `YYYY-MM-DD HH:MM:SS` string, truncated to whole seconds."""
+
+    tm = time.gmtime(timestamp)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}{separator}{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}"
+    )
+
+
+def get_game_event_key(event_id: str) -> str:
+    """Generate a Redis key for a stored game event."""
+
+    return f"{_GAME_EVENT_KEY_PREFIX}{event_id}"
 
 
 def get_game_state_key(match_id: str) -> str:
     """Generate a Redis key for the game state."""
 
-    return f"{settings.redis_game_state_namespace}:game:{match_id}"
+    return f"{_GAME_STATE_KEY_PREFIX}{match_id}"
 
 
 def get_team_state_key(team_id: str, match_id: str = None) -> str:
@@ -36,7 +79,7 @@ def get_team_state_key(team_id: str, match_id: str = None) -> str:
     if match_id is None:
         raise ValueError(f"Team ID {team_id} not found in registry.")
 
-    return f"{settings.redis_game_state_namespace}:game:{match_id}:team:{team_id}"
+    return f"{_GAME_STATE_KEY_PREFIX}{match_id}:team:{team_id}"
 
 
 def get_player_state_key(player_id: str, match_id: str = None) -> str:
@@ -48,7 +91,13 @@ def get_player_state_key(player_id: str, match_id: str = None) -> str:
     if match_id is None:
         raise ValueError(f"Player ID {player_id} not found in registry.")
 
-    return f"{settings.redis_game_state_namespace}:game:{match_id}:player:{player_id}"
+    return f"{_GAME_STATE_KEY_PREFIX}{match_id}:player:{player_id}"
+
+
+def get_player_kill_streaks_key(player_id: str, match_id: str = None) -> str:
+    """Generate a Redis key for the player's kill streaks."""
+
+    return f"{get_player_state_key(player_id, match_id)}:kill_streaks"
 
 
 def get_player_kill_history_key(player_id: str) -> str:
@@ -59,7 +108,7 @@ def get_player_kill_history_key(player_id: str) -> str:
     if match_id is None:
         raise ValueError(f"Player ID {player_id} not found in registry.")
 
-    return f"{settings.redis_game_state_namespace}:game:{match_id}:player:{player_id}:kill_history"
+    return f"{_GAME_STATE_KEY_PREFIX}{match_id}:player:{player_id}:kill_history"
 
 
 def get_player_death_history_key(player_id: str) -> str:
@@ -70,27 +119,36 @@ def get_player_death_history_key(player_id: str) -> str:
     if match_id is None:
         raise ValueError(f"Player ID {player_id} not found in registry.")
 
-    return f"{settings.redis_game_state_namespace}:game:{match_id}:player:{player_id}:death_history"
+    return f"{_GAME_STATE_KEY_PREFIX}{match_id}:player:{player_id}:death_history"
 
 
 class PlayerRegistry:
-    """In memory registry for matching players to their current game and team."""
+    """In memory registry for matching players to their current game and team.
+
+    Players are stored as `player_id -> (match_id, team_id)`, with inverted indexes of players per match and team.
+    """
 
-    _matches: dict[str, dict[str, str]] = {}
+    _matches: dict[str, tuple[str, str]] = {}
     _teams: dict[str, str] = {}
+    _players_by_match: dict[str, set[str]] = {}
+    _players_by_team: dict[str, set[str]] = {}
 
     @classmethod
     def register_player(cls, player_id: str, match_id: str, team_id: str) -> None:
         """Register a player with their match and team."""
 
-        cls._matches[player_id] = {"match_id": match_id, "team_id": team_id}
+        cls.unregister_player(player_id)
+        cls._matches[player_id] = (match_id, team_id)
         cls._teams[team_id] = match_id
+        cls._players_by_match.setdefault(match_id, set()).add(player_id)
+        cls._players_by_team.setdefault(team_id, set()).add(player_id)
 
     @classmethod
     def get_match_id_for_player(cls, player_id: str) -> str:
         """Get the match ID for a player."""
 
-        return cls._matches.get(player_id, {}).get("match_id")
+        registration = cls._matches.get(player_id)
+        return registration[0] if registration else None
 
     @classmethod
     def get_match_id_for_team(cls, team_id: str) -> str:
@@ -102,25 +160,31 @@ class PlayerRegistry:
     def get_team_id(cls, player_id: str) -> str:
         """Get the team ID for a player."""
 
-        return cls._matches.get(player_id, {}).get("team_id")
+        registration = cls._matches.get(player_id)
+        return registration[1] if registration else None
 
     @classmethod
     def players_for_team(cls, team_id: str) -> list[str]:
         """Get all players for a team."""
 
-        return [player_id for player_id, data in cls._matches.items() if data.get("team_id") == team_id]
+        return list(cls._players_by_team.get(team_id, ()))
 
     @classmethod
     def players_for_match(cls, match_id: str) -> list[str]:
         """Get all players for a match."""
 
-        return [player_id for player_id, data in cls._matches.items() if data.get("match_id") == match_id]
+        return list(cls._players_by_match.get(match_id, ()))
 
     @classmethod
     def unregister_player(cls, player_id: str) -> None:
         """Unregister a player."""
 
-        cls._matches.pop(player_id, None)
+        registration = cls._matches.pop(player_id, None)
+
+        if registration is not None:
+            match_id, team_id = registration
+            cls._discard_from_index(cls._players_by_match, match_id, player_id)
+            cls._discard_from_index(cls._players_by_team, team_id, player_id)
 
     @classmethod
     def unregister_team(cls, team_id: str) -> None:
@@ -128,14 +192,27 @@ class PlayerRegistry:
 
         cls._teams.pop(team_id, None)
 
+    @staticmethod
+    def _discard_from_index(index: dict[str, set[str]], key: str, player_id: str) -> None:
+        """Remove a player from an index entry, dropping the entry once it is empty."""
+
+        players = index.get(key)
+
+        if players is not None:
+            players.discard(player_id)
+
+            if not players:
+                del index[key]
 
-async def add_kill_history(history_key: str, timestamp: float, kill_type: str) -> None:
-    """Add a kill timestamp and type to the player's kill history."""
 
-    redis = await get_redis_connection()
-    member_data = {"timestamp": timestamp, "kill_type": kill_type}
-    member = json.dumps(member_data)
-    await redis.zadd(history_key, {member: timestamp})
+def add_kill_history(pipe: Pipeline, history_key: str, timestamp: float, kill_type: str) -> None:
+    """Queue a kill timestamp and type into the player's kill history on the given pipeline.
+
+    Kill history members are `<kill_type>:<timestamp>` strings scored by the kill timestamp, so that the
+    history can be read back with `ZRANGE ... WITHSCORES` without decoding each member.
+    """
+
+    pipe.zadd(history_key, {f"{kill_type}:{timestamp}": timestamp})
 
 
 def calculate_kill_streaks(kill_timestamps: list[float], streak_window: int) -> list[str]:
@@ -143,79 +220,63 @@ def calculate_kill_streaks(kill_timestamps: list[float], streak_window: int) ->
     Calculates kill streaks (Double, Triple, Quadra, Penta) from a sorted list of timestamps.
     """
 
+    streaks = []
+
+    for streak_length, last_kill_timestamp in scan_kill_streaks(kill_timestamps, streak_window):
+        formatted_timestamp = format_utc_timestamp(last_kill_timestamp)
+        streaks.append(f"{KILL_STREAK_LABELS[streak_length]} at {formatted_timestamp}")
+
+    return streaks
+
+
+def scan_kill_streaks(kill_timestamps: list[float], streak_window: int) -> list[tuple[int, float]]:
+    """
+    Finds kill streaks in a sorted list of timestamps as (streak length, last kill timestamp) pairs.
+    """
+
     streaks = []
     n = len(kill_timestamps)
     i = 0
 
     while i < n:
-        current_streak = [kill_timestamps[i]]
+        last_kill_timestamp = kill_timestamps[i]
+        streak_length = 1
         j = i + 1
 
-        while j < n and (kill_timestamps[j] - current_streak[-1]) <= streak_window and len(current_streak) < 5:
-            current_streak.append(kill_timestamps[j])
+        while j < n and (kill_timestamps[j] - last_kill_timestamp) <= streak_window and streak_length < 5:
+            last_kill_timestamp = kill_timestamps[j]
+            streak_length += 1
             j += 1
 
-        streak_length = len(current_streak)
-
         if streak_length >= 2:
-            last_kill_timestamp = current_streak[-1]
-            datetime_object = datetime.fromtimestamp(last_kill_timestamp, UTC)
-            formatted_timestamp = datetime_object.strftime("%Y-%m-%d %H:%M:%S")
-
-            if streak_length == 2:
-                streaks.append(f"Double Kill at {formatted_timestamp}")
-            elif streak_length == 3:
-                streaks.append(f"Triple Kill at {formatted_timestamp}")
-            elif streak_length == 4:
-                streaks.append(f"Quadra Kill at {formatted_timestamp}")
-            elif streak_length == 5:
-                streaks.append(f"Penta Kill at {formatted_timestamp}")
+            streaks.append((streak_length, last_kill_timestamp))
 
         i = j
 
     return streaks
 
 
-def calculate_max_killing_spree(kill_history: list[dict], death_history: list[float]) -> int:
+def calculate_max_killing_spree(kill_history: list[tuple[str, float]], death_history: list[float]) -> int:
     """
     Calculates the maximum killing spree for a player, given their kill and death history.
+
+    Kill history is a list of (member, timestamp) pairs as stored by `add_kill_history`.
     """
 
-    human_kills = [kill["timestamp"] for kill in kill_history if kill["kill_type"] == "human"]
+    human_kills = [timestamp for member, timestamp in kill_history if member.startswith("human:")]
 
-    streak = 0
-    max_streak = 0
-    death_index = 0
+    # Group kills by the number of deaths before them, kills after the last death do not end a spree
     num_deaths = len(death_history)
+    streaks = Counter(bisect_right(death_history, kill) for kill in human_kills)
+    streaks.pop(num_deaths, None)
 
-    for kill in human_kills:
-        # Move to the next death if current kill is after it
-        while death_index < num_deaths and kill >= death_history[death_index]:
-            max_streak = max(max_streak, streak)
-            streak = 0
-            death_index += 1
-
-        if death_index < num_deaths:
-            streak += 1
-
-    # In case there are kills after the last death
-    max_streak = max(max_streak, streak)
-
-    return max_streak
+    return max(streaks.values(), default=0)
 
 
 def max_killing_spree_label(max_killing_spree: int) -> str | None:
     """Returns a label for the maximum."""
 
-    if max_killing_spree > 7:
-        max_killing_spree = 7
-
-    label_map = {
-        3: "Killing Spree",
-        4: "Rampage",
-        5: "Unstoppable",
-        6: "Dominating",
-        7: "Godlike",
-    }
+    if max_killing_spree < 3:
+        return None
 
-    return label_map.get(max_killing_spree)
+    return KILLING_SPREE_LABELS[min(max_killing_spree, len(KILLING_SPREE_LABELS) - 1)]
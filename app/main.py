@@ -3,7 +3,9 @@
 import asyncio
 import logging
 import signal
+import sys
 
+from app import settings
 from app.connectors.rabbitmq import get_rabbitmq_connection
 from app.connectors.redis import get_redis_connection
 from app.game_event.consumer import start_consumer as start_game_events_consumer
@@ -45,4 +47,9 @@ async def shutdown() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if settings.use_uvloop and sys.platform != "win32":
+        import uvloop
+
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
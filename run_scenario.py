@@ -1,13 +1,13 @@
 """Run a game scenario for sample game."""
 
 import asyncio
-import json
 import logging
 import os
 from pprint import pprint
 
 import aio_pika
 import aio_pika.abc
+import orjson
 
 from app.connectors.rabbitmq import get_game_events_queue
 from app.connectors.redis import get_redis_connection
@@ -55,13 +55,13 @@ async def publish_game_event(
     """Publish a single game event to the queue."""
 
     logger.info("Publishing game event: %s", event_file)
-    with open(event_file, "r") as file:
+    with open(event_file, "rb") as file:
         try:
-            data = json.load(file)
+            data = orjson.loads(file.read())
         except Exception as e:
             logger.exception("Error decoding JSON File: %s", event_file)
         else:
-            message = aio_pika.Message(body=json.dumps(data).encode())
+            message = aio_pika.Message(body=orjson.dumps(data))
             await exchange.publish(message, routing_key=queue.name)
             logger.info("Published message: %s", message.body.decode())
 
@@ -2,7 +2,7 @@
 
 import pytest
 
-from app.game_state.utils import calculate_kill_streaks
+from app.game_state.utils import calculate_kill_streaks, calculate_max_killing_spree
 
 
 @pytest.mark.asyncio(scope="session")
@@ -76,3 +76,30 @@ async def test_calculate_kill_streaks_end_to_end(scenario_runner, expected_kill_
 def test_calculate_kill_streaks(kill_timestamps, streak_window, expected_streaks):
     actual_streaks = calculate_kill_streaks(kill_timestamps, streak_window)
     assert actual_streaks == expected_streaks
+
+
+def _human_kills(*timestamps):
+    return [(f"human:{timestamp}", timestamp) for timestamp in timestamps]
+
+
+@pytest.mark.parametrize(
+    "kill_history, death_history, expected_spree",
+    [
+        pytest.param(_human_kills(1, 2, 3), [], 0, id="no_deaths"),
+        pytest.param([], [1, 2], 0, id="no_kills"),
+        pytest.param(_human_kills(6, 7, 8), [5], 0, id="kills_only_after_last_death"),
+        pytest.param(_human_kills(1, 2, 3), [4], 3, id="single_spree"),
+        pytest.param(_human_kills(1, 2, 3), [3, 10], 2, id="kill_at_death_timestamp_counts_after_death"),
+        pytest.param(
+            [("human:1", 1), ("minion:2", 2), ("human:3", 3), ("minion:4", 4)],
+            [5],
+            2,
+            id="non_human_kills_ignored",
+        ),
+        pytest.param(_human_kills(1, 2, 3, 5, 6, 7, 8, 10, 11), [4, 9, 12], 4, id="multiple_sprees"),
+        pytest.param(_human_kills(1, 2, 4, 5, 6, 8), [3, 7], 3, id="spree_ends_between_deaths"),
+    ],
+)
+def test_calculate_max_killing_spree(kill_history, death_history, expected_spree):
+    actual_spree = calculate_max_killing_spree(kill_history, death_history)
+    assert actual_spree == expected_spree
@@ -0,0 +1,40 @@
+"""Tests module for timestamp conversions."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from app.game_state.utils import format_utc_timestamp, from_unix_timestamp
+
+
+@pytest.mark.parametrize(
+    "timestamp, expected_iso",
+    [
+        pytest.param(0, "1970-01-01T00:00:00+00:00", id="epoch"),
+        pytest.param(1704110475, "2024-01-01T12:01:15+00:00", id="whole_second_int"),
+        pytest.param(1704110475.0, "2024-01-01T12:01:15+00:00", id="whole_second_float"),
+        pytest.param(1704110475.25, "2024-01-01T12:01:15.250000+00:00", id="fractional"),
+        pytest.param(1704110475.000001, "2024-01-01T12:01:15.000001+00:00", id="fractional_microsecond"),
+        pytest.param(-1, "1969-12-31T23:59:59+00:00", id="negative_one"),
+    ],
+)
+def test_from_unix_timestamp(timestamp, expected_iso):
+    actual_iso = from_unix_timestamp(timestamp)
+    assert actual_iso == expected_iso
+    assert actual_iso == datetime.fromtimestamp(timestamp, UTC).isoformat()
+
+
+@pytest.mark.parametrize(
+    "timestamp, separator, expected_formatted",
+    [
+        pytest.param(0, " ", "1970-01-01 00:00:00", id="epoch"),
+        pytest.param(1704110475, " ", "2024-01-01 12:01:15", id="whole_second"),
+        pytest.param(1704110475.75, " ", "2024-01-01 12:01:15", id="fractional_truncated"),
+        pytest.param(1704110475, "T", "2024-01-01T12:01:15", id="iso_separator"),
+        pytest.param(-1, " ", "1969-12-31 23:59:59", id="negative_one"),
+    ],
+)
+def test_format_utc_timestamp(timestamp, separator, expected_formatted):
+    actual_formatted = format_utc_timestamp(timestamp, separator)
+    assert actual_formatted == expected_formatted
+    assert actual_formatted == datetime.fromtimestamp(int(timestamp), UTC).strftime(f"%Y-%m-%d{separator}%H:%M:%S")
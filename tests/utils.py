@@ -1,11 +1,12 @@
 """Utility functions for testing."""
 
 import asyncio
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterator
 
 import aio_pika
+import orjson
 
 from app.connectors.rabbitmq import get_game_events_queue
 from app.game_state.services import GameState
@@ -26,7 +27,7 @@ async def publish_game_events(scenario_name: str) -> None:
     game_events_queue = await get_game_events_queue()
 
     for event in events_for_scenario(scenario_name):
-        message = aio_pika.Message(body=json.dumps(event).encode())
+        message = aio_pika.Message(body=orjson.dumps(event))
 
         await game_events_queue.channel.default_exchange.publish(
             message,
@@ -61,15 +62,13 @@ def events_for_scenario(scenario_name: str) -> Iterator[dict]:
     """Load events from a scenario file."""
 
     scenario_path = os.path.join(get_scenarios_folder(), scenario_name)
-    event_files = sorted(os.listdir(scenario_path))
-    start_event_file = event_files[0]
-    end_event_file = event_files[-1]
-
-    def load_event(file_name: str) -> dict:
-        with open(os.path.join(scenario_path, file_name), "r") as file:
-            return json.load(file)
-
-    yield load_event(start_event_file)
-    for event_file in event_files[1:-1]:
-        yield load_event(event_file)
-    yield load_event(end_event_file)
+    # Match start and end events are the first and the last files in name order
+    event_files = sorted(entry.path for entry in os.scandir(scenario_path) if entry.is_file())
+
+    def load_event(file_path: str) -> dict:
+        with open(file_path, "rb") as file:
+            return orjson.loads(file.read())
+
+    # Read and decode upcoming files in the background while earlier events are published
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        yield from executor.map(load_event, event_files)